@@ -12,12 +12,15 @@ Features:
 """
 
 import os
+import copy
 import math
+import time
 import random
+import secrets
 import asyncio
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from dotenv import load_dotenv
-import motor.motor_asyncio
+from pymongo import AsyncMongoClient, UpdateOne, WriteConcern
 import discord
 from discord.ext import commands
 from discord.ui import View, Button, button
@@ -43,17 +46,114 @@ if not DISCORD_BOT_TOKEN or not MONGO_URI:
 intents = discord.Intents.default()
 intents.message_content = True        # required to read message content if you use it
 intents.members = True                # required to resolve @mentions to Member objects
-bot = commands.Bot(command_prefix="!", intents=intents, help_command=None)
+
+
+class DotaBot(commands.Bot):
+    async def setup_hook(self):
+        # runs once inside the event loop, before the gateway connects
+        connect_mongo()
+        await ensure_indexes()
+        try:
+            await backfill_eliminated()
+        except Exception as e:
+            print(f"❌ Eliminated backfill failed: {e}")
+
+    async def close(self):
+        # stop background tasks first so they don't hit a closed client or message mid-teardown
+        for task in (tourney_watch_task, queue_edit_task):
+            if task is not None and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        if client is not None:
+            await client.close()
+        await super().close()
+
+
+bot = DotaBot(command_prefix="!", intents=intents, help_command=None)
 
 # ---------- MongoDB ----------
-client = motor.motor_asyncio.AsyncIOMotorClient(MONGO_URI)
-db = client[MONGO_DB_NAME]
-players_col = db["players"]         # player documents
-tournaments_col = db["tournaments"] # tournaments
-queue_col = db["queue"]             # single document for queue
+# one shared client, created by connect_mongo() from DotaBot.setup_hook
+client = None
+db = None
+players_col = None          # player documents
+players_col_majority = None # same collection, majority write concern for ELO / stats writes
+tournaments_col = None      # tournaments
+queue_col = None            # single document for queue
+
+def connect_mongo():
+    global client, db, players_col, players_col_majority, tournaments_col, queue_col
+    # w=1 without journaling by default: most writes (queue, match winners) are cheap to redo
+    client = AsyncMongoClient(
+        MONGO_URI, maxPoolSize=20, minPoolSize=5, w=1, journal=False, retryWrites=True
+    )
+    db = client[MONGO_DB_NAME]
+    players_col = db["players"]
+    players_col_majority = players_col.with_options(write_concern=WriteConcern(w="majority"))
+    tournaments_col = db["tournaments"]
+    queue_col = db["queue"]
 
 # ---------- Constants ----------
 K_FACTOR = 32
+DISCORD_MESSAGE_LIMIT = 2000
+PLAYER_CACHE_TTL = 30.0   # seconds a fetched player doc is reused
+
+# ---------- In-process read cache ----------
+# key -> (fetched_at, doc); callers always get a deep copy so they can mutate freely
+tourney_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+player_cache: Dict[int, Tuple[float, Dict[str, Any]]] = {}
+
+def cache_get(cache: Dict[Any, Tuple[float, Dict[str, Any]]], key: Any, ttl: float) -> Optional[Dict[str, Any]]:
+    entry = cache.get(key)
+    if entry is None:
+        return None
+    fetched_at, doc = entry
+    if time.monotonic() - fetched_at >= ttl:
+        cache.pop(key, None)
+        return None
+    return copy.deepcopy(doc)
+
+def cache_put(cache: Dict[Any, Tuple[float, Dict[str, Any]]], key: Any, doc: Optional[Dict[str, Any]]):
+    if doc is not None:
+        cache[key] = (time.monotonic(), copy.deepcopy(doc))
+
+# tourney_cache is filled only by the change stream below; while it runs, cached
+# tournaments never expire, and without it tournaments are not cached at all
+tourney_watch_task: Optional[asyncio.Task] = None
+tourney_watch_active = False
+
+async def watch_tournaments():
+    """Mirror tournament inserts/updates into tourney_cache via a change stream (needs a replica set)."""
+    global tourney_watch_active
+    pipeline = [{"$match": {"operationType": {"$in": ["insert", "update", "replace"]}}}]
+    try:
+        async with await tournaments_col.watch(pipeline, full_document="updateLookup") as stream:
+            # entries cached before the stream opened may have missed changes
+            tourney_cache.clear()
+            tourney_watch_active = True
+            async for change in stream:
+                doc = change.get("fullDocument")
+                if doc:
+                    cache_put(tourney_cache, doc["name"], doc)
+    except Exception as e:
+        print(f"❌ Tournament change stream stopped: {e}")
+    finally:
+        tourney_watch_active = False
+        tourney_cache.clear()
+
+def invalidate_tournament(name: str):
+    tourney_cache.pop(name, None)
+
+# bumped on every invalidation; a read only caches its result if no invalidation
+# happened while it was in flight (otherwise it may have raced a write)
+player_cache_gen: Dict[int, int] = {}
+
+def invalidate_players(discord_ids: List[int]):
+    for pid in discord_ids:
+        player_cache.pop(pid, None)
+        player_cache_gen[pid] = player_cache_gen.get(pid, 0) + 1
 
 # ---------- Utility helpers ----------
 
@@ -77,18 +177,46 @@ async def ensure_player_doc(discord_id: int, display_name: Optional[str] = None)
         base = {"discord_id": discord_id, "name": display_name or str(discord_id),
                 "wins": 0, "losses": 0, "elo": 1200}
         await players_col.insert_one(base)
+        invalidate_players([discord_id])
         return base
     # update name if provided
     if display_name and doc.get("name") != display_name:
         await players_col.update_one({"discord_id": discord_id}, {"$set": {"name": display_name}})
+        invalidate_players([discord_id])
         doc["name"] = display_name
     return doc
 
 async def get_player(discord_id: int) -> Dict[str, Any]:
-    return await players_col.find_one({"discord_id": discord_id})
+    doc = cache_get(player_cache, discord_id, PLAYER_CACHE_TTL)
+    if doc is None:
+        gen = player_cache_gen.get(discord_id, 0)
+        doc = await players_col.find_one({"discord_id": discord_id})
+        if player_cache_gen.get(discord_id, 0) == gen:
+            cache_put(player_cache, discord_id, doc)
+    return doc
+
+async def get_players(discord_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+    """Fetch many players at once: cached docs first, the rest in a single $in query."""
+    players = {}
+    missing = []
+    for pid in discord_ids:
+        doc = cache_get(player_cache, pid, PLAYER_CACHE_TTL)
+        if doc is None:
+            missing.append(pid)
+        else:
+            players[pid] = doc
+    if missing:
+        gens = {pid: player_cache_gen.get(pid, 0) for pid in missing}
+        async for doc in players_col.find({"discord_id": {"$in": missing}}):
+            pid = doc["discord_id"]
+            if player_cache_gen.get(pid, 0) == gens[pid]:
+                cache_put(player_cache, pid, doc)
+            players[pid] = doc
+    return players
 
 async def set_player(discord_id: int, update: Dict[str, Any]):
     await players_col.update_one({"discord_id": discord_id}, {"$set": update})
+    invalidate_players([discord_id])
 
 async def adjust_elo_for_match(winner_ids: List[int], loser_ids: List[int], k: int = K_FACTOR):
     """
@@ -98,71 +226,136 @@ async def adjust_elo_for_match(winner_ids: List[int], loser_ids: List[int], k: i
       expected_score = 1/(1+10^((opp - team)/400))
       Each player gets rating += K * (score - expected)
     """
-    # fetch docs
+    # fetch all docs in one round-trip, create any missing ones in one more
+    all_ids = winner_ids + loser_ids
     players = {}
-    for pid in winner_ids + loser_ids:
-        players[pid] = await ensure_player_doc(pid)
+    cursor = players_col.find({"discord_id": {"$in": all_ids}})
+    async for doc in cursor:
+        players[doc["discord_id"]] = doc
+    missing = [{"discord_id": pid, "name": str(pid), "wins": 0, "losses": 0, "elo": 1200}
+               for pid in dict.fromkeys(all_ids) if pid not in players]
+    if missing:
+        await players_col.insert_many(missing, ordered=False)
+        for d in missing:
+            players[d["discord_id"]] = d
 
     win_avg = sum(players[p]["elo"] for p in winner_ids)/len(winner_ids)
     lose_avg = sum(players[p]["elo"] for p in loser_ids)/len(loser_ids)
 
     expected_win = 1 / (1 + 10 ** ((lose_avg - win_avg)/400))
-    expected_lose = 1 - expected_win
-
-    # winners -> score 1 , losers -> 0
-    updates = []
-    for pid in winner_ids:
-        old = players[pid]["elo"]
-        new = round(old + k * (1 - expected_win))
-        updates.append((pid, new))
-    for pid in loser_ids:
-        old = players[pid]["elo"]
-        new = round(old + k * (0 - expected_lose))
-        updates.append((pid, new))
-
-    # persist and increment wins/losses
-    for pid, new_elo in updates:
-        if pid in winner_ids:
-            await players_col.update_one({"discord_id": pid}, {"$inc": {"wins": 1}, "$set": {"elo": new_elo}})
-        else:
-            await players_col.update_one({"discord_id": pid}, {"$inc": {"losses": 1}, "$set": {"elo": new_elo}})
+
+    # winners -> score 1 , losers -> 0; every player on a team shares the same delta
+    # (losers: K * (0 - (1 - expected_win)) == -win_delta)
+    win_delta = k * (1 - expected_win)
+    ops = [UpdateOne({"discord_id": pid}, {"$inc": {"wins": 1}, "$set": {"elo": round(players[pid]["elo"] + win_delta)}})
+           for pid in winner_ids]
+    ops += [UpdateOne({"discord_id": pid}, {"$inc": {"losses": 1}, "$set": {"elo": round(players[pid]["elo"] - win_delta)}})
+            for pid in loser_ids]
+
+    # persist and increment wins/losses in a single bulk write
+    await players_col_majority.bulk_write(ops, ordered=False)
+    invalidate_players(all_ids)
 
 async def elo_leaderboard(limit: int = 20) -> List[Dict[str, Any]]:
     cursor = players_col.find().sort("elo", -1).limit(limit)
     return [doc async for doc in cursor]
 
-def team_display(team_players: List[int], players_cache: Dict[int, Dict[str, Any]] = None) -> str:
+def player_labels(pids: List[int], players_cache: Dict[int, Dict[str, Any]] = None) -> Dict[int, str]:
+    """Display label per player id: cached name, falling back to a mention. Build once, reuse per team."""
+    players_cache = players_cache or {}
+    return {pid: (players_cache.get(pid) or {}).get("name") or f"<@{pid}>" for pid in pids}
+
+def team_display(team_players: List[int], labels: Dict[int, str]) -> str:
     if not team_players:
         return "No players"
-    names = []
-    for pid in team_players:
-        if players_cache and pid in players_cache:
-            names.append(players_cache[pid].get("name") or f"<@{pid}>")
-        else:
-            names.append(f"<@{pid}>")
-    return ", ".join(names)
+    return ", ".join(map(labels.__getitem__, team_players))
+
+def match_line(m: Dict[str, Any]) -> str:
+    if m.get("bye"):
+        return f"[{m['id']}] Bye → **{m['teamA']}** (auto)"
+    return f"[{m['id']}] {m['teamA']} vs {m['teamB']} — Winner: {m.get('winner') or 'TBD'}"
+
+def render_bracket(title: str, sections: List[Tuple[str, List[str], str]], footer: Optional[str] = None,
+                   limit: int = DISCORD_MESSAGE_LIMIT) -> str:
+    """Join (header, match lines oldest first, empty text) sections into one message.
+       Over `limit`, the oldest match lines are dropped (longest section first), so the
+       headers, the newest matches and the footer are always kept.
+    """
+    hidden = [0] * len(sections)
+
+    def render() -> str:
+        lines = [title]
+        for (header, match_lines, empty), n in zip(sections, hidden):
+            lines.append(header)
+            if n:
+                lines.append(f"… {n} older matches not shown")
+            lines.extend(match_lines[n:] if match_lines else (empty,))
+        if footer:
+            lines.append(footer)
+        return "\n".join(lines)
+
+    text = render()
+    excess = len(text) - limit
+    while excess > 0:
+        i = max(range(len(sections)), key=lambda j: len(sections[j][1]) - hidden[j])
+        match_lines = sections[i][1]
+        if hidden[i] == len(match_lines):
+            break
+        excess -= len(match_lines[hidden[i]]) + 1
+        hidden[i] += 1
+        if excess <= 0:
+            # re-measure: the "not shown" notices add a little text back
+            text = render()
+            excess = len(text) - limit
+    return render()
 
 # ---------- Tournament helpers ----------
 def make_match_id() -> str:
-    return str(random.getrandbits(64))[:12]
+    # 48 uniformly random bits as 12 hex chars
+    return secrets.token_hex(6)
 
-def create_round_matches(team_ids: List[str]) -> List[Dict[str, Any]]:
-    """Randomize and pair teams. Return list of match objects.
-       If odd, last team gets bye (match with 'bye': True)
+def seed_positions(size: int) -> List[int]:
+    """Inner-outer bracket order for `size` seeds (power of two), e.g. 8 -> [1,8,4,5,2,7,3,6].
+       Adjacent pairs always sum to size+1, so top seeds only meet late.
+    """
+    positions = [1, 2]
+    while len(positions) < size:
+        n = len(positions) * 2
+        positions = [p for pos in positions for p in (pos, n + 1 - pos)]
+    return positions[:size]
+
+def create_round_matches(team_ids: List[str], ratings: Optional[Dict[str, float]] = None,
+                         seed: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Seed teams by rating (highest first, random among equals) and pair them inner-outer:
+       1 vs N, 2 vs N-1, ... Return list of match objects.
+       If odd, bottom seed gets bye (match with 'bye': True)
+       The same team_ids order, ratings and `seed` reproduce the same pairing.
     """
-    shuffled = team_ids[:]
-    random.shuffle(shuffled)
+    ratings = ratings or {}
+    seeded = random.Random(seed).sample(team_ids, len(team_ids))
+    seeded.sort(key=lambda t: ratings.get(t, 0), reverse=True)
     matches = []
-    while len(shuffled) >= 2:
-        a = shuffled.pop()
-        b = shuffled.pop()
-        matches.append({"id": make_match_id(), "teamA": a, "teamB": b, "winner": None, "bracket": "upper"})
-    if shuffled:
-        bye = shuffled.pop()
+    n = len(seeded) - len(seeded) % 2
+    bye = seeded[n] if n < len(seeded) else None
+    if n:
+        # seed t plays seed n+1-t; matches follow the inner-outer bracket order of the top seeds
+        for hi in (p for p in seed_positions(1 << (n - 1).bit_length()) if p <= n // 2):
+            a, b = seeded[hi - 1], seeded[n - hi]
+            matches.append({"id": make_match_id(), "teamA": a, "teamB": b, "winner": None, "bracket": "upper"})
+    if bye is not None:
         # bye is an auto-advance; represent as a match with teamB = None
         matches.append({"id": make_match_id(), "teamA": bye, "teamB": None, "winner": bye, "bracket": "upper", "bye": True})
     return matches
 
+async def team_ratings(teams: Dict[str, List[int]]) -> Dict[str, float]:
+    """Average player ELO per team (unregistered players count as 1200)."""
+    players = await get_players(list({pid for plist in teams.values() for pid in plist}))
+    ratings = {}
+    for team, pids in teams.items():
+        elos = [players[pid]["elo"] if pid in players else 1200 for pid in pids]
+        ratings[team] = sum(elos) / len(elos) if elos else 1200
+    return ratings
+
 async def create_tournament_doc(name: str) -> Dict[str, Any]:
     doc = {
         "name": name,
@@ -173,6 +366,7 @@ async def create_tournament_doc(name: str) -> Dict[str, Any]:
         "matches": [],        # all matches (history + pending), match objects (see create_round_matches)
         "upper_rounds": [],   # list of rounds (each round list of match ids)
         "lower_rounds": [],
+        "eliminated": [],     # team ids that lost a lower bracket match
         "final": None         # final match id when set
     }
     await tournaments_col.insert_one(doc)
@@ -181,15 +375,31 @@ async def create_tournament_doc(name: str) -> Dict[str, Any]:
 async def get_tournament(name: str) -> Optional[Dict[str, Any]]:
     return await tournaments_col.find_one({"name": name})
 
-async def update_tournament(name: str, update: Dict[str, Any]):
-    await tournaments_col.update_one({"name": name}, {"$set": update})
-
-async def append_match_to_tourney(name: str, match: Dict[str, Any]):
-    await tournaments_col.update_one({"name": name}, {"$push": {"matches": match}})
+async def get_tournament_lite(name: str, projection: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Fetch only the projected fields, always from Mongo.
+       Commands that read then write tournament state use this, never the cache,
+       so they can't act on (and write back) a stale copy.
+    """
+    return await tournaments_col.find_one({"name": name}, projection)
 
-async def push_round(name: str, bracket: str, round_match_ids: List[str]):
-    field = "upper_rounds" if bracket == "upper" else "lower_rounds"
-    await tournaments_col.update_one({"name": name}, {"$push": {field: round_match_ids}})
+async def get_bracket_view(name: str) -> Optional[Dict[str, Any]]:
+    """Fetch only what the bracket display needs, with matches split by bracket server-side.
+       When the change stream has a current copy cached, the view is built from it instead.
+    """
+    # only the change stream fills tourney_cache (a read here may already be older
+    # than an event it has applied), so a miss falls through to the projected query
+    tourney = cache_get(tourney_cache, name, math.inf) if tourney_watch_active else None
+    if tourney:
+        matches = tourney.get("matches", [])
+        return {"status": tourney.get("status"), "champion": tourney.get("champion"),
+                "upper_matches": [m for m in matches if m.get("bracket") == "upper"],
+                "lower_matches": [m for m in matches if m.get("bracket") == "lower"]}
+    return await tournaments_col.find_one(
+        {"name": name},
+        {"_id": 0, "status": 1, "champion": 1,
+         "upper_matches": {"$filter": {"input": "$matches", "cond": {"$eq": ["$$this.bracket", "upper"]}}},
+         "lower_matches": {"$filter": {"input": "$matches", "cond": {"$eq": ["$$this.bracket", "lower"]}}}}
+    )
 
 async def find_match(tourney: Dict[str, Any], match_id: str) -> Optional[Dict[str, Any]]:
     for m in tourney.get("matches", []):
@@ -197,99 +407,132 @@ async def find_match(tourney: Dict[str, Any], match_id: str) -> Optional[Dict[st
             return m
     return None
 
+async def ensure_indexes():
+    # each index on its own, so e.g. duplicate discord_ids blocking the unique index don't skip the rest
+    indexes = [
+        (players_col, "discord_id", {"unique": True}),
+        (players_col, [("elo", -1)], {}),
+        (tournaments_col, "name", {"unique": True}),
+        (tournaments_col, [("name", 1), ("matches.id", 1)], {}),
+    ]
+    for col, keys, options in indexes:
+        try:
+            await col.create_index(keys, **options)
+        except Exception as e:
+            print(f"❌ Index {keys} on {col.name} failed: {e}")
+
+def eliminated_from_matches(matches: List[Dict[str, Any]]) -> List[str]:
+    """Losers of decided lower bracket matches, derived from match history."""
+    eliminated = set()
+    for m in matches:
+        if m.get("bracket") == "lower" and m.get("winner") is not None and not m.get("bye"):
+            loser = m["teamA"] if m["teamB"] == m["winner"] else m["teamB"]
+            if loser:
+                eliminated.add(loser)
+    return list(eliminated)
+
+async def backfill_eliminated():
+    """One-off migration: tournaments created before `eliminated` was tracked get it rebuilt from matches."""
+    async for t in tournaments_col.find({"eliminated": {"$exists": False}}, {"name": 1, "matches": 1}):
+        await tournaments_col.update_one(
+            {"_id": t["_id"], "eliminated": {"$exists": False}},
+            {"$set": {"eliminated": eliminated_from_matches(t.get("matches", []))}}
+        )
+
 # pairing helpers (when winners are available)
 async def try_pair_pending(tourney_name: str):
     """Try to pair pending_upper into matches and pending_lower into matches.
        Create matches whenever >=2 pending teams exist. If odd, last one gets bye.
     """
-    tourney = await get_tournament(tourney_name)
+    tourney = await get_tournament_lite(
+        tourney_name, {"teams": 1, "eliminated": 1, "pending_upper": 1, "pending_lower": 1}
+    )
     if not tourney:
         return
 
-    updated = False
+    new_matches = []
+    new_upper_round_ids = []
+    new_lower_round_ids = []
 
     # UPPER bracket
     pu = tourney.get("pending_upper", [])
+    paired_upper = pu[:]  # every team read here gets a match or a bye below
     while len(pu) >= 2:
         a = pu.pop(0); b = pu.pop(0)
         m = {"id": make_match_id(), "teamA": a, "teamB": b, "winner": None, "bracket": "upper"}
-        await append_match_to_tourney(tourney_name, m)
-        # append match id to latest upper_round or create a new round
-        await push_round(tourney_name, "upper", [m["id"]])
-        updated = True
+        new_matches.append(m)
+        new_upper_round_ids.append(m["id"])
     if len(pu) == 1:
         # give bye
         bye_team = pu.pop(0)
         m = {"id": make_match_id(), "teamA": bye_team, "teamB": None, "winner": bye_team, "bracket": "upper", "bye": True}
-        await append_match_to_tourney(tourney_name, m)
-        await push_round(tourney_name, "upper", [m["id"]])
-        updated = True
+        new_matches.append(m)
+        new_upper_round_ids.append(m["id"])
 
     # LOWER bracket
     pl = tourney.get("pending_lower", [])
+    paired_lower = pl[:]
     while len(pl) >= 2:
         a = pl.pop(0); b = pl.pop(0)
         m = {"id": make_match_id(), "teamA": a, "teamB": b, "winner": None, "bracket": "lower"}
-        await append_match_to_tourney(tourney_name, m)
-        await push_round(tourney_name, "lower", [m["id"]])
-        updated = True
+        new_matches.append(m)
+        new_lower_round_ids.append(m["id"])
     if len(pl) == 1:
         # give bye in lower
         bye_team = pl.pop(0)
         m = {"id": make_match_id(), "teamA": bye_team, "teamB": None, "winner": bye_team, "bracket": "lower", "bye": True}
-        await append_match_to_tourney(tourney_name, m)
-        await push_round(tourney_name, "lower", [m["id"]])
-        updated = True
-
-    if updated:
-        # store modified pendings
-        await tournaments_col.update_one({"name": tourney_name}, {"$set": {"pending_upper": pu, "pending_lower": pl}})
+        new_matches.append(m)
+        new_lower_round_ids.append(m["id"])
+
+    if new_matches:
+        # store new matches and their rounds, and remove only the teams paired here from the
+        # pendings (a concurrent matchresult may have pushed more since they were read), in one write
+        push = {"matches": {"$each": new_matches}}
+        pull = {}
+        if new_upper_round_ids:
+            push["upper_rounds"] = new_upper_round_ids
+            pull["pending_upper"] = paired_upper
+        if new_lower_round_ids:
+            push["lower_rounds"] = new_lower_round_ids
+            pull["pending_lower"] = paired_lower
+        await tournaments_col.update_one(
+            {"name": tourney_name},
+            {"$push": push, "$pullAll": pull}
+        )
+        invalidate_tournament(tourney_name)
 
     # After pairing, check for terminal condition: only one team remains overall
-    t = await get_tournament(tourney_name)
-    # Determine alive teams: any team that has not been eliminated (we'll track teams by existence in pending pools or winners)
-    # Simpler approach: check all teams vs losers recorded in match history
-    all_team_names = list(t.get("teams", {}).keys())
-    eliminated = set()
-    for m in t.get("matches", []):
-        if m.get("bracket") == "lower" and m.get("winner") is not None and not m.get("bye"):
-            # the loser of lower bracket matches is eliminated
-            loser = m["teamA"] if m["teamB"] == m["winner"] else m["teamB"]
-            # If loser is not None
-            if loser:
-                eliminated.add(loser)
-        elif m.get("bracket") == "upper" and m.get("winner") is not None and m.get("teamB") is None and m.get("bye"):
-            # bye auto-advance, no elimination
-            pass
+    # Teams and eliminations are not touched by pairing, so the doc fetched above is still current
+    all_team_names = list(tourney.get("teams", {}).keys())
+    eliminated = set(tourney.get("eliminated", []))
     alive = [tm for tm in all_team_names if tm not in eliminated]
     if len(alive) == 1:
         # declare champion
         champ = alive[0]
         await tournaments_col.update_one({"name": tourney_name}, {"$set": {"status": "finished", "champion": champ}})
+        invalidate_tournament(tourney_name)
         # finalization done
         return
 
 # ---------- Commands ----------
 
 # ---- Help
-@bot.command(name="helpme")
-async def helpme(ctx):
-    msg = """
-**Dota2 Tournament Bot - Commands**
-(Use @mention for players)
-**Registration / Profile**
+# built once at import; every !helpme sends the same embed
+HELP_EMBED = discord.Embed(
+    title="Dota2 Tournament Bot - Commands",
+    description="(Use @mention for players)",
+    color=discord.Color.blurple()
+)
+HELP_EMBED.add_field(name="Registration / Profile", value="""\
 !register @user      — register user (create profile)
-!profile @user       — view player's stats (ELO/wins/losses)
-
-**Queue**
+!profile @user       — view player's stats (ELO/wins/losses)""", inline=False)
+HELP_EMBED.add_field(name="Queue", value="""\
 !join               — join queue (uses your discord id)
 !leave              — leave queue
-!showqueue          — show queue
-
-**Leaderboard**
-!leaderboard        — show top players by ELO
-
-**Tournament**
+!showqueue          — show queue""", inline=False)
+HELP_EMBED.add_field(name="Leaderboard", value="""\
+!leaderboard        — show top players by ELO""", inline=False)
+HELP_EMBED.add_field(name="Tournament", value="""\
 !createtourney NAME
 !addteam NAME TEAMNAME @p1 @p2 ...   — add team with players (5 players typical)
 !showteams NAME
@@ -297,9 +540,11 @@ async def helpme(ctx):
 !showbracket NAME                    — show current bracket/text tree
 !matchresult NAME MATCH_ID @winner_team_name_here @loser_team_name_here  — report result using exact team names
 !setelo @user VALUE                  — (admin) set player's ELO
-!resetelo @user                      — (admin) reset player's ELO to 1200
-"""
-    await ctx.send(msg)
+!resetelo @user                      — (admin) reset player's ELO to 1200""", inline=False)
+
+@bot.command(name="helpme")
+async def helpme(ctx):
+    await ctx.send(embed=HELP_EMBED)
 
 # ---- Players
 @bot.command(name="register")
@@ -316,14 +561,18 @@ async def profile(ctx, member: discord.Member = None):
 # ---- Queue
 
 queue = []
+queue_lock = asyncio.Lock()   # guards check-then-modify on `queue` across awaits
 current_queue_message = None  # Track the message showing the queue
+QUEUE_EDIT_DELAY = 0.2        # seconds to coalesce rapid button presses into one edit
+queue_edit_pending = asyncio.Event()
+queue_edit_task: Optional[asyncio.Task] = None
 
 @bot.tree.command(name="startqueue", description="Start a new queue with join/leave buttons")
 @app_commands.guilds(discord.Object(id=GUILD_ID))
 async def start_queue(interaction: discord.Interaction):
-    global queue_message
+    global current_queue_message
     queue.clear()
-    queue_message = None
+    current_queue_message = None
     await interaction.response.send_message("Queue started below ⬇️", ephemeral=True)
     await update_queue_message(interaction)
 
@@ -335,27 +584,38 @@ class QueueView(View):
     @button(label="🎮 Join Queue", style=discord.ButtonStyle.success)
     async def join_button(self, interaction: discord.Interaction, button: Button):
         user = interaction.user.display_name
-        if user in queue:
+        # only in-memory work under the lock; Discord calls happen after releasing it
+        full_lobby = None
+        async with queue_lock:
+            already_queued = user in queue
+            if not already_queued:
+                queue.append(user)
+                if len(queue) == 10:
+                    full_lobby = create_queue_embed()
+                    queue.clear()
+
+        if already_queued:
             await interaction.response.send_message(f"⚠️ {user}, you're already in the queue.", ephemeral=True)
             return
 
-        queue.append(user)
-        await update_queue_message(interaction)
-        
-        if len(queue) == 10:
+        # the full lobby is shown from its snapshot, since the queue has already been reset
+        await update_queue_message(interaction, snapshot=full_lobby)
+        if full_lobby is not None:
             await interaction.channel.send("✅ **10 players have joined! Lobby is ready to start!**")
-            queue.clear()
             await asyncio.sleep(1)
             await interaction.channel.send(embed=create_queue_embed(), view=QueueView())
 
     @button(label="🚪 Leave Queue", style=discord.ButtonStyle.danger)
     async def leave_button(self, interaction: discord.Interaction, button: Button):
         user = interaction.user.display_name
-        if user not in queue:
+        async with queue_lock:
+            queued = user in queue
+            if queued:
+                queue.remove(user)
+
+        if not queued:
             await interaction.response.send_message(f"❌ {user}, you're not in the queue.", ephemeral=True)
             return
-
-        queue.remove(user)
         await update_queue_message(interaction)
 
 
@@ -376,13 +636,42 @@ def create_queue_embed():
     return embed
 
 
-async def update_queue_message(interaction: discord.Interaction):
-    """Update the current queue embed after any change."""
-    global current_queue_message
+async def queue_message_editor():
+    """Background loop: wait for a pending change, let a burst settle, then edit once."""
+    while True:
+        await queue_edit_pending.wait()
+        await asyncio.sleep(QUEUE_EDIT_DELAY)
+        if not queue_edit_pending.is_set():
+            # a snapshot edit already showed this change while we slept
+            continue
+        queue_edit_pending.clear()
+        await edit_queue_message()
+
+
+async def edit_queue_message(embed: Optional[discord.Embed] = None):
     if current_queue_message:
-        await current_queue_message.edit(embed=create_queue_embed(), view=QueueView())
-    else:
-        current_queue_message = await interaction.channel.send(embed=create_queue_embed(), view=QueueView())
+        try:
+            await current_queue_message.edit(embed=embed or create_queue_embed(), view=QueueView())
+        except discord.HTTPException as e:
+            print(f"❌ Queue message edit failed: {e}")
+
+
+async def update_queue_message(interaction: discord.Interaction, snapshot: Optional[discord.Embed] = None):
+    """Update the current queue embed after any change.
+       Edits are debounced so a burst of clicks results in a single message edit;
+       a `snapshot` embed is shown right away instead.
+    """
+    global current_queue_message, queue_edit_task
+    if not current_queue_message:
+        current_queue_message = await interaction.channel.send(embed=snapshot or create_queue_embed(), view=QueueView())
+        return
+    if snapshot is not None:
+        queue_edit_pending.clear()
+        await edit_queue_message(snapshot)
+        return
+    queue_edit_pending.set()
+    if queue_edit_task is None or queue_edit_task.done():
+        queue_edit_task = asyncio.create_task(queue_message_editor())
 
 
 @bot.command(name="showqueue")
@@ -451,20 +740,22 @@ async def leaderboard_cmd(ctx, limit: int = 10):
 @commands.has_permissions(administrator=True)
 async def setelo(ctx, member: discord.Member, value: int):
     await ensure_player_doc(member.id, member.display_name)
-    await players_col.update_one({"discord_id": member.id}, {"$set": {"elo": int(value)}})
+    await players_col_majority.update_one({"discord_id": member.id}, {"$set": {"elo": int(value)}})
+    invalidate_players([member.id])
     await ctx.send(f"Set ELO for {member.display_name} to {value}")
 
 @bot.command(name="resetelo")
 @commands.has_permissions(administrator=True)
 async def resetelo(ctx, member: discord.Member):
     await ensure_player_doc(member.id, member.display_name)
-    await players_col.update_one({"discord_id": member.id}, {"$set": {"elo": 1200}})
+    await players_col_majority.update_one({"discord_id": member.id}, {"$set": {"elo": 1200}})
+    invalidate_players([member.id])
     await ctx.send(f"Reset ELO for {member.display_name} to 1200")
 
 # ---- Tournament commands
 @bot.command(name="createtourney")
 async def createtourney(ctx, name: str):
-    existing = await get_tournament(name)
+    existing = await get_tournament_lite(name, {"_id": 1})
     if existing:
         await ctx.send("Tournament with this name already exists.")
         return
@@ -473,21 +764,28 @@ async def createtourney(ctx, name: str):
 
 @bot.command(name="addteam")
 async def addteam(ctx, tourney_name: str, team_name: str, *members: discord.Member):
-    tourney = await get_tournament(tourney_name)
+    tourney = await get_tournament_lite(tourney_name, {"_id": 1})
     if not tourney:
         await ctx.send("Tournament not found.")
         return
     player_ids = [m.id for m in members]
-    # ensure players exist
-    for m in members:
-        await ensure_player_doc(m.id, m.display_name)
+    # ensure players exist (and refresh names) in one bulk upsert
+    if members:
+        ops = [UpdateOne({"discord_id": m.id},
+                         {"$setOnInsert": {"wins": 0, "losses": 0, "elo": 1200},
+                          "$set": {"name": m.display_name}},
+                         upsert=True)
+               for m in members]
+        await players_col.bulk_write(ops, ordered=False)
+        invalidate_players(player_ids)
     # update teams map
     await tournaments_col.update_one({"name": tourney_name}, {"$set": {f"teams.{team_name}": player_ids}})
+    invalidate_tournament(tourney_name)
     await ctx.send(f"Added team **{team_name}** with {len(player_ids)} players to {tourney_name}")
 
 @bot.command(name="showteams")
 async def showteams(ctx, tourney_name: str):
-    tourney = await get_tournament(tourney_name)
+    tourney = await get_tournament_lite(tourney_name, {"teams": 1})
     if not tourney:
         await ctx.send("Tournament not found.")
         return
@@ -495,19 +793,13 @@ async def showteams(ctx, tourney_name: str):
     if not teams:
         await ctx.send("No teams yet.")
         return
-    players_cache = {}
-    for pid in {pid for plist in teams.values() for pid in plist}:
-        pdoc = await get_player(pid)
-        if pdoc:
-            players_cache[pid] = pdoc
-    lines = []
-    for t, pids in teams.items():
-        lines.append(f"**{t}** — {team_display(pids, players_cache)}")
-    await ctx.send("**Teams:**\n" + "\n".join(lines))
+    all_pids = list({pid for plist in teams.values() for pid in plist})
+    labels = player_labels(all_pids, await get_players(all_pids))
+    await ctx.send("**Teams:**\n" + "\n".join(f"**{t}** — {team_display(pids, labels)}" for t, pids in teams.items()))
 
 @bot.command(name="starttourney")
 async def starttourney(ctx, tourney_name: str):
-    tourney = await get_tournament(tourney_name)
+    tourney = await get_tournament_lite(tourney_name, {"teams": 1})
     if not tourney:
         await ctx.send("Tournament not found.")
         return
@@ -515,16 +807,24 @@ async def starttourney(ctx, tourney_name: str):
     if len(teams) < 2:
         await ctx.send("Need at least 2 teams.")
         return
-    # initial matches in upper bracket
-    matches = create_round_matches(teams)
-    # persist matches and initial pending lists
-    for m in matches:
-        await append_match_to_tourney(tourney_name, m)
-    # set pending pools empty (we'll use matches to track winners)
-    await tournaments_col.update_one({"name": tourney_name}, {"$set": {"status": "running", "pending_upper": [], "pending_lower": []}})
-    # push this round ids into upper_rounds
+    # initial matches in upper bracket, seeded by average team ELO
+    ratings = await team_ratings(tourney.get("teams", {}))
+    seed = secrets.randbits(32)
+    matches = create_round_matches(teams, ratings, seed)
+    # ratings change after every match, so store the snapshot used here next to the seed;
+    # replay: create_round_matches([t for t, _ in seed_ratings], dict(seed_ratings), seed)
+    # (a list of pairs, since team names may not be valid Mongo field names)
+    seed_ratings = [[t, ratings[t]] for t in teams]
+    # persist matches, this round's ids in upper_rounds and empty pending pools
+    # (we'll use matches to track winners) in a single write
     round_ids = [m["id"] for m in matches]
-    await tournaments_col.update_one({"name": tourney_name}, {"$push": {"upper_rounds": {"$each": [round_ids]}}})
+    await tournaments_col.update_one(
+        {"name": tourney_name},
+        {"$set": {"status": "running", "pending_upper": [], "pending_lower": [],
+                  "seed": seed, "seed_ratings": seed_ratings},
+         "$push": {"matches": {"$each": matches}, "upper_rounds": round_ids}}
+    )
+    invalidate_tournament(tourney_name)
     # reply
     s = []
     for m in matches:
@@ -536,44 +836,28 @@ async def starttourney(ctx, tourney_name: str):
 
 @bot.command(name="showbracket")
 async def showbracket(ctx, tourney_name: str):
-    tourney = await get_tournament(tourney_name)
+    tourney = await get_bracket_view(tourney_name)
     if not tourney:
         await ctx.send("Tournament not found.")
         return
-    teams = tourney.get("teams", {})
-    matches = tourney.get("matches", [])
     # build text tree: show latest upper rounds then lower
-    lines = [f"**Tournament: {tourney_name}** — Status: {tourney.get('status','NA')}"]
-    # Upper rounds
-    lines.append("\n__Upper bracket matches (most recent first)__")
-    upper_matches = [m for m in matches if m.get("bracket") == "upper"]
-    if not upper_matches:
-        lines.append("No upper matches yet.")
-    else:
-        for m in upper_matches:
-            if m.get("bye"):
-                lines.append(f"[{m['id']}] Bye → **{m['teamA']}** (auto)")
-            else:
-                lines.append(f"[{m['id']}] {m['teamA']} vs {m['teamB']} — Winner: {m.get('winner') or 'TBD'}")
-    # Lower rounds
-    lines.append("\n__Lower bracket matches__")
-    lower_matches = [m for m in matches if m.get("bracket") == "lower"]
-    if not lower_matches:
-        lines.append("No lower matches yet.")
-    else:
-        for m in lower_matches:
-            if m.get("bye"):
-                lines.append(f"[{m['id']}] Bye → **{m['teamA']}** (auto)")
-            else:
-                lines.append(f"[{m['id']}] {m['teamA']} vs {m['teamB']} — Winner: {m.get('winner') or 'TBD'}")
+    title = f"**Tournament: {tourney_name}** — Status: {tourney.get('status','NA')}"
+    sections = [
+        ("\n__Upper bracket matches (most recent first)__",
+         [match_line(m) for m in tourney.get("upper_matches") or []], "No upper matches yet."),
+        ("\n__Lower bracket matches__",
+         [match_line(m) for m in tourney.get("lower_matches") or []], "No lower matches yet."),
+    ]
     # final
-    if tourney.get("champion"):
-        lines.append(f"\n🏆 **Champion: {tourney.get('champion')}**")
-    await ctx.send("\n".join(lines))
+    footer = f"\n🏆 **Champion: {tourney.get('champion')}**" if tourney.get("champion") else None
+    await ctx.send(render_bracket(title, sections, footer))
 
 @bot.command(name="matchresult")
 async def matchresult(ctx, tourney_name: str, match_id: str, winner_team: str, loser_team: str):
-    tourney = await get_tournament(tourney_name)
+    # only the teams and the reported match are needed, not the whole match history
+    tourney = await get_tournament_lite(
+        tourney_name, {"teams": 1, "matches": {"$elemMatch": {"id": match_id}}}
+    )
     if not tourney:
         await ctx.send("Tournament not found.")
         return
@@ -589,24 +873,19 @@ async def matchresult(ctx, tourney_name: str, match_id: str, winner_team: str, l
     if winner_team not in teams or loser_team not in teams:
         await ctx.send("One or both team names not found in tournament (use exact team name).")
         return
+    if {winner_team, loser_team} != {match["teamA"], match["teamB"]}:
+        await ctx.send(f"Match {match_id} is **{match['teamA']}** vs **{match['teamB']}**; report the result with those two teams.")
+        return
     # set winner
     match["winner"] = winner_team
-    # persist match update
-    # update in DB: replace matches array item
-    await tournaments_col.update_one(
-        {"name": tourney_name, "matches.id": match_id},
-        {"$set": {"matches.$.winner": winner_team}}
-    )
-    # move loser to pending_lower
-    # get current pendings
-    tdoc = await get_tournament(tourney_name)
-    pend_lower = tdoc.get("pending_lower", [])
-    pend_lower.append(loser_team)
-    await tournaments_col.update_one({"name": tourney_name}, {"$set": {"pending_lower": pend_lower}})
-    # winner goes to pending_upper (for next round)
-    pend_upper = tdoc.get("pending_upper", [])
-    pend_upper.append(winner_team)
-    await tournaments_col.update_one({"name": tourney_name}, {"$set": {"pending_upper": pend_upper}})
+    # persist match winner, move loser to pending_lower and winner to pending_upper (next round)
+    update = {"$set": {"matches.$.winner": winner_team},
+              "$push": {"pending_lower": loser_team, "pending_upper": winner_team}}
+    if match.get("bracket") == "lower":
+        # the loser of a lower bracket match is eliminated
+        update["$addToSet"] = {"eliminated": loser_team}
+    await tournaments_col.update_one({"name": tourney_name, "matches.id": match_id}, update)
+    invalidate_tournament(tourney_name)
     # adjust ELO and W/L for each player
     winner_pids = teams[winner_team]
     loser_pids = teams[loser_team]
@@ -614,7 +893,7 @@ async def matchresult(ctx, tourney_name: str, match_id: str, winner_team: str, l
     # Attempt to pair pending pools into matches
     await try_pair_pending(tourney_name)
     # re-fetch tourney to check champion
-    updated = await get_tournament(tourney_name)
+    updated = await get_tournament_lite(tourney_name, {"status": 1, "champion": 1})
     if updated.get("status") == "finished":
         champ = updated.get("champion")
         # award champion — optionally give leaderboard points or announce in channel
@@ -625,7 +904,10 @@ async def matchresult(ctx, tourney_name: str, match_id: str, winner_team: str, l
 # ---------- Event handlers & start ----------
 @bot.event
 async def on_ready():
+    global tourney_watch_task
     print(f"✅ Logged in as {bot.user}")
+    if tourney_watch_task is None or tourney_watch_task.done():
+        tourney_watch_task = asyncio.create_task(watch_tournaments())
     try:
         synced = await bot.tree.sync(guild=discord.Object(id=GUILD_ID))
         print(f"🔁 Synced {len(synced)} command(s) with guild {GUILD_ID}")